@@ -1,12 +1,24 @@
-from flask import Flask, render_template_string, send_file
+from flask import Flask, render_template_string, send_file, request, abort
 import cv2
 import threading
 import time
+import queue
+from contextlib import nullcontext
 import numpy as np
 import os
+import re
+import hmac
+import sys
 import logging
 from ultralytics import YOLO
 from deep_sort_realtime.deepsort_tracker import DeepSort
+from deep_sort_realtime.embedder.embedder_pytorch import MobileNetv2_Embedder
+
+# Shared helpers live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_ring import FrameRing
+from postprocess import boxes_to_tracker_input
+from timeline import VisibilityIndex
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
@@ -28,52 +40,240 @@ definitions = {
     }
 }
 
-# Global variables to store video metadata and detections
-video_metadata = {
-    'fps': 30.0,  # Default fallback
-    'total_frames': 0,
-    'duration': 0,
-    'width': 1280,
-    'height': 480
+# Processing settings; /admin/reload can override any of these at runtime
+DEFAULT_CONFIG = {
+    'video_file': VIDEO_FILE,
+    'engine_path': ENGINE_PATH,
+    'definitions': definitions,
+    'conf': 0.4,          # Detection confidence threshold
+    'imgsz': 1280,        # Inference input size
+    'min_box_size': 20,   # Skip detections narrower or shorter than this
+    'max_frames': 5000,   # Limit on processed frames
 }
-all_detections = {}
-processed = False
-
-# Initialize YOLO model
-try:
-    # Remove any specific size expectations by using the default configuration
-    model = YOLO(ENGINE_PATH)
-    logger.info(f"Successfully loaded YOLO model from {ENGINE_PATH}")
-except Exception as e:
-    logger.error(f"Failed to load YOLO model: {e}")
-    model = None
-
-# Initialize tracker
-tracker = DeepSort(max_age=5)
-track_classes = {}  # Class ID tracker
-
-# Process all frames at startup
-def process_video():
-    global all_detections, video_metadata, processed
+
+# /admin and /jobs endpoints require a matching X-Admin-Token header and are
+# disabled when no token is configured
+ADMIN_TOKEN = os.environ.get('SHOPPABLE_ADMIN_TOKEN')
+
+# Videos set through /admin/reload or /jobs must live under this directory
+CATALOG_ROOT = os.path.realpath(os.environ.get('SHOPPABLE_CATALOG_ROOT', os.path.dirname(VIDEO_FILE)))
+
+# Number of catalog videos processed concurrently
+CATALOG_WORKERS = int(os.environ.get('SHOPPABLE_CATALOG_WORKERS', 2))
+VIDEO_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+# A reprocessed store with more failed frames than this is not swapped in
+MAX_FRAME_ERRORS = 0
+
+
+class DetectionStore:
+    """Video metadata and detections served to viewers for one processed video."""
+
+    def __init__(self, config, generation=0):
+        self.config = config
+        self.generation = generation
+        self.video_metadata = {
+            'fps': 30.0,  # Default fallback
+            'total_frames': 0,
+            'duration': 0,
+            'width': 1280,
+            'height': 480
+        }
+        self.all_detections = {}
+        self.timeline = VisibilityIndex()  # Per-class and per-track visible intervals
+        self.processed = False
+        self.error = None
+        self.frame_errors = 0  # Frames whose processing raised
+        self.previous = None   # Store this one replaced, kept for open players
+        self.holds_model = False  # Whether this store holds a reference on its engine
+
+    def failure(self):
+        """Why this store must not be served as a replacement, or None."""
+        if self.error:
+            return self.error
+        if self.frame_errors > MAX_FRAME_ERRORS:
+            return f"{self.frame_errors} frames failed to process"
+        return None
+
+
+def validate_definitions(definitions):
+    """Return an error message if class definitions are malformed, or None."""
+    if not isinstance(definitions, dict):
+        return "definitions must be an object"
+    classes = definitions.get('classes')
+    if not isinstance(classes, list) or not classes or not all(isinstance(c, str) and c for c in classes):
+        return "definitions.classes must be a non-empty list of strings"
+    links = definitions.get('links')
+    if not isinstance(links, dict) or not all(isinstance(links.get(c), str) for c in classes):
+        return "definitions.links needs a URL for every class"
+    return None
+
+
+def validate_settings(settings):
+    """Return an error message for unknown or malformed processing settings, or None."""
+    if not isinstance(settings, dict):
+        return "settings must be an object"
+    unknown = set(settings) - set(DEFAULT_CONFIG)
+    if unknown:
+        return f"unknown settings: {', '.join(sorted(unknown))}"
+    
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    
+    for key in ('video_file', 'engine_path'):
+        if key in settings and not (isinstance(settings[key], str) and settings[key]):
+            return f"{key} must be a non-empty string"
+    if 'video_file' in settings:
+        video_file = os.path.realpath(settings['video_file'])
+        if os.path.commonpath([video_file, CATALOG_ROOT]) != CATALOG_ROOT:
+            return f"video_file must be inside {CATALOG_ROOT}"
+    if 'conf' in settings and not (isinstance(settings['conf'], (int, float)) and not isinstance(settings['conf'], bool)
+                                   and 0 <= settings['conf'] <= 1):
+        return "conf must be a number between 0 and 1"
+    if 'imgsz' in settings and not (is_int(settings['imgsz']) and 32 <= settings['imgsz'] <= 4096):
+        return "imgsz must be an integer between 32 and 4096"
+    if 'min_box_size' in settings and not (is_int(settings['min_box_size']) and settings['min_box_size'] >= 0):
+        return "min_box_size must be a non-negative integer"
+    if 'max_frames' in settings and not (is_int(settings['max_frames']) and settings['max_frames'] > 0):
+        return "max_frames must be a positive integer"
+    if 'definitions' in settings:
+        return validate_definitions(settings['definitions'])
+    return None
+
+
+def store_for_generation(current, generation):
+    """The store an open player of `generation` should be served from, or None."""
+    if generation is None or generation == current.generation:
+        return current
+    if current.previous is not None and current.previous.generation == generation:
+        return current.previous
+    return None
+
+
+def load_model(engine_path):
+    try:
+        # Remove any specific size expectations by using the default configuration
+        model = YOLO(engine_path)
+        logger.info(f"Successfully loaded YOLO model from {engine_path}")
+        return model
+    except Exception as e:
+        logger.error(f"Failed to load YOLO model: {e}")
+        return None
+
+
+# Loaded models shared by the main store and all catalog workers, keyed by
+# engine path. Each comes with a lock since a predictor must not run
+# concurrently, and a count of the stores using it so that an engine nobody
+# uses any more is freed instead of staying in GPU memory.
+models = {}  # engine path -> [model, inference lock, users]
+models_lock = threading.Lock()
+
+def acquire_model(store):
+    """Load or reuse the store's engine and take a reference on it.
+
+    Returns (model, inference lock), or (None, None) if loading failed.
+    """
+    engine_path = store.config['engine_path']
+    with models_lock:
+        if engine_path not in models:
+            model = load_model(engine_path)
+            if model is None:
+                return None, None
+            models[engine_path] = [model, threading.Lock(), 0]
+        entry = models[engine_path]
+        entry[2] += 1
+        store.holds_model = True
+        return entry[0], entry[1]
+
+def release_model(store):
+    """Drop the store's reference on its engine, freeing the engine when unused."""
+    if not store.holds_model:
+        return
+    store.holds_model = False
+    engine_path = store.config['engine_path']
+    with models_lock:
+        entry = models[engine_path]
+        entry[2] -= 1
+        if entry[2] == 0:
+            del models[engine_path]
+            logger.info(f"Released unused YOLO model {engine_path}")
+
+
+class SharedEmbedder:
+    """Appearance embedder shared by all trackers, one predict() at a time."""
+
+    def __init__(self, embedder):
+        self._embedder = embedder
+        self._lock = threading.Lock()
+
+    def predict(self, crops):
+        with self._lock:
+            return self._embedder.predict(crops)
+
+
+# Loaded on first use so every tracker reuses the same network
+embedder = None
+embedder_init_lock = threading.Lock()
+
+def create_tracker():
+    """DeepSort tracker with its own track state and the shared embedder."""
+    global embedder
+    with embedder_init_lock:
+        if embedder is None:
+            # Same embedder DeepSort builds by default
+            embedder = SharedEmbedder(MobileNetv2_Embedder(half=True, max_batch_size=16, bgr=True, gpu=True))
+    tracker = DeepSort(max_age=5, embedder=None)
+    tracker.embedder = embedder
+    return tracker
+
+
+# The live store. Viewers read `store` once per request and reloads replace
+# it with a single assignment, so requests never see a partially processed
+# store from a reload.
+store = DetectionStore(DEFAULT_CONFIG)
+
+# Held while a store is being processed; only one reload runs at a time
+reload_lock = threading.Lock()
+reload_status = {'state': 'idle', 'error': None}
+
+# Process all frames of a store's video
+def process_video(store, model, model_lock=None, on_ready=None):
+    config = store.config
+    definitions = config['definitions']
+    
+    # Tracker state belongs to this processing run
+    tracker = create_tracker()
+    track_classes = {}  # Class ID tracker
     
     # Get video metadata first
-    cap = cv2.VideoCapture(VIDEO_FILE)
+    cap = cv2.VideoCapture(config['video_file'])
     if not cap.isOpened():
-        logger.error(f"Failed to open video file: {VIDEO_FILE}")
-        processed = True
+        logger.error(f"Failed to open video file: {config['video_file']}")
+        store.error = f"Failed to open video file: {config['video_file']}"
+        store.processed = True
         return
         
     fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     
     if fps <= 0 or fps > 120:
         fps = 30.0  # Default fallback
         
     duration = total_frames / fps if fps > 0 else 0
     
-    video_metadata = {
+    # Frames are decoded sequentially into reused buffers instead of seeking
+    # and allocating a new frame each time. The ring is sized from the first
+    # decoded frame since reported dimensions can be wrong (e.g. rotated video).
+    ring = FrameRing.for_capture(cap, slots=2)
+    if ring is None:
+        logger.error(f"No frames could be decoded from: {config['video_file']}")
+        store.error = f"No frames could be decoded from: {config['video_file']}"
+        cap.release()
+        store.processed = True
+        return
+    height, width = ring.shape[:2]
+    
+    store.video_metadata = {
         'fps': fps,
         'total_frames': total_frames,
         'duration': duration,
@@ -83,137 +283,442 @@ def process_video():
     
     logger.info(f"Processing video: {total_frames} frames at {fps} FPS")
     
-    # Process frames
-    for frame_idx in range(min(total_frames, 5000)):  # Limit to max 5000 frames
-        # Read frame
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-            
-        try:
-            if model is None:
-                # Skip if model failed to load
-                frame_objects = []
-            else:
-                # NEW: Let YOLO handle the resizing internally
-                # The imgsz parameter will be passed to the model to specify input dimensions
-                results = model(frame, conf=0.4, imgsz=1280)[0]
+    # The video opened and decodes, so the store can be served
+    if on_ready is not None:
+        on_ready()
+    
+    try:
+        # Process frames
+        for frame_idx in range(min(total_frames, config['max_frames'])):
+            # Read frame
+            slot, frame = ring.read(cap)
+            if slot is None:
+                break
             
-            # Format detections for tracker
-            detections = []
-            for box in results.boxes:
-                # Get coordinates
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                w = x2 - x1
-                h = y2 - y1
-                
-                # Skip tiny detections
-                if w < 20 or h < 20:
-                    continue
+            try:
+                if model is None:
+                    # Skip if model failed to load
+                    detections = []
+                else:
+                    with model_lock or nullcontext():
+                        # NEW: Let YOLO handle the resizing internally
+                        # The imgsz parameter will be passed to the model to specify input dimensions
+                        results = model(frame, conf=config['conf'], imgsz=config['imgsz'])[0]
                     
-                conf = float(box.conf)
-                class_id = int(box.cls)
-                
-                # Add to detection list for tracker
-                detections.append(([int(x1), int(y1), int(w), int(h)], conf, class_id))
+                        # Format detections for tracker: one transfer of all boxes, then
+                        # vectorized size, confidence and class filtering
+                        detections = boxes_to_tracker_input(
+                            results.boxes,
+                            min_size=config['min_box_size'],
+                            conf=config['conf'],
+                            num_classes=len(definitions['classes'])
+                        )
             
-            # Update tracker
-            frame_objects = []
-            if model is None:
-                # Skip detection if model failed to load
-                pass
-            elif detections:
-                tracks = tracker.update_tracks(detections, frame=frame)
+                # Update tracker
+                frame_objects = []
+                if model is None:
+                    # Skip detection if model failed to load
+                    pass
+                elif detections:
+                    tracks = tracker.update_tracks(detections, frame=frame)
                 
-                # Process tracked objects
-                for track in tracks:
-                    if not track.is_confirmed():
-                        continue
+                    # Process tracked objects
+                    for track in tracks:
+                        if not track.is_confirmed():
+                            continue
                         
-                    track_id = track.track_id
+                        track_id = track.track_id
                     
-                    # Get or update class ID
-                    if hasattr(track, 'det_class'):
-                        class_id = track.det_class
-                        track_classes[track_id] = class_id
-                    elif track_id in track_classes:
-                        class_id = track_classes[track_id]
-                    else:
-                        continue
+                        # Get or update class ID
+                        if hasattr(track, 'det_class'):
+                            class_id = track.det_class
+                            track_classes[track_id] = class_id
+                        elif track_id in track_classes:
+                            class_id = track_classes[track_id]
+                        else:
+                            continue
                         
-                    if class_id >= len(definitions['classes']):
-                        continue
+                        if class_id >= len(definitions['classes']):
+                            continue
                         
-                    # Get box coordinates
-                    x1, y1, x2, y2 = map(int, track.to_ltrb())
-                    class_name = definitions['classes'][class_id]
+                        # Get box coordinates
+                        x1, y1, x2, y2 = map(int, track.to_ltrb())
+                        class_name = definitions['classes'][class_id]
                     
-                    # Store detection data
-                    frame_objects.append({
-                        'id': track_id,
-                        'box': [x1, y1, x2 - x1, y2 - y1],
-                        'class': class_name,
-                        'link': definitions['links'][class_name],
-                        'confidence': float(track.get_det_conf()) if hasattr(track, 'get_det_conf') and track.get_det_conf() is not None else 0.8
-                    })
+                        # Store detection data
+                        frame_objects.append({
+                            'id': track_id,
+                            'box': [x1, y1, x2 - x1, y2 - y1],
+                            'class': class_name,
+                            'link': definitions['links'][class_name],
+                            'confidence': float(track.get_det_conf()) if hasattr(track, 'get_det_conf') and track.get_det_conf() is not None else 0.8
+                        })
             
-            # Store frame detections
-            all_detections[frame_idx] = frame_objects
+                # Store frame detections
+                store.all_detections[frame_idx] = frame_objects
+                store.timeline.add_frame(frame_idx, frame_objects)
             
-            # Log progress
-            if frame_idx % 100 == 0:
-                logger.info(f"Processed {frame_idx}/{total_frames} frames")
+                # Log progress
+                if frame_idx % 100 == 0:
+                    logger.info(f"Processed {frame_idx}/{total_frames} frames")
                 
+            except Exception as e:
+                logger.error(f"Error processing frame {frame_idx}: {e}")
+                store.all_detections[frame_idx] = []
+                store.frame_errors += 1
+            finally:
+                ring.release(slot)
+    except Exception as e:
+        logger.error(f"Error decoding {config['video_file']}: {e}")
+        store.error = f"Error decoding {config['video_file']}: {e}"
+    finally:
+        cap.release()
+        ring.close()
+        store.processed = True
+    
+    logger.info(f"Finished processing video. Processed {len(store.all_detections)} frames")
+
+def process_initial():
+    # Nothing is being served yet, so the first video is processed in place
+    with reload_lock:
+        # The live store keeps its engine referenced until a reload replaces it
+        process_video(store, *acquire_model(store))
+
+def reload_store(overrides):
+    # Process into a shadow store and swap it in only once it is complete.
+    # Runs with reload_lock held by the caller.
+    global store
+    shadow = None
+    try:
+        current = store
+        config = dict(current.config, **overrides)
+        reload_status.update(state='loading', error=None)
+        
+        shadow = DetectionStore(config, generation=current.generation + 1)
+        new_model, new_model_lock = acquire_model(shadow)
+        if new_model is None:
+            raise RuntimeError(f"Failed to load YOLO model from {config['engine_path']}")
+        
+        reload_status['state'] = 'processing'
+        process_video(shadow, new_model, new_model_lock)
+        if shadow.failure():
+            raise RuntimeError(shadow.failure())
+        
+        # Keep the replaced store (but not its own predecessor) for players
+        # still showing it, so their video and boxes stay consistent. It only
+        # needs its data now, so its engine reference is dropped.
+        current.previous = None
+        shadow.previous = current
+        store = shadow
+        release_model(current)
+        reload_status['state'] = 'idle'
+        logger.info(f"Swapped in store generation {shadow.generation}")
+    except Exception as e:
+        logger.error(f"Reload failed, keeping current store: {e}")
+        reload_status.update(state='failed', error=str(e))
+        if shadow is not None:
+            release_model(shadow)
+    finally:
+        reload_lock.release()
+
+class CatalogJob:
+    """One queued processing run of a catalog video."""
+
+    def __init__(self, video_id, config, generation=0):
+        self.video_id = video_id
+        self.store = DetectionStore(config, generation)
+        self.state = 'queued'
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        frames = len(self.store.all_detections)
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0
+        return {
+            'video_id': self.video_id,
+            'state': self.state,
+            'video_file': self.store.config['video_file'],
+            'frames_processed': frames,
+            'total_frames': self.store.video_metadata['total_frames'],
+            'elapsed_s': round(elapsed, 2),
+            'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'error': self.store.error,
+        }
+
+
+# Catalog videos served at /videos/<id>/. A re-queued video keeps serving its
+# previous store until the new run is complete.
+catalog_stores = {}  # video id -> store served to viewers
+catalog_jobs = {}    # video id -> latest job
+catalog_lock = threading.Lock()
+job_queue = queue.Queue()
+
+def catalog_worker():
+    while True:
+        job = job_queue.get()
+        job.state = 'running'
+        job.started_at = time.time()
+        
+        def register(job=job):
+            # A video's first run is served while it is processed, like the
+            # main store, but only once the video is known to decode
+            with catalog_lock:
+                catalog_stores.setdefault(job.video_id, job.store)
+        
+        try:
+            model, model_lock = acquire_model(job.store)
+            if model is None:
+                job.store.error = f"Failed to load YOLO model from {job.store.config['engine_path']}"
+            else:
+                # Tracker state is created per run inside process_video
+                process_video(job.store, model, model_lock, on_ready=register)
         except Exception as e:
-            logger.error(f"Error processing frame {frame_idx}: {e}")
-            all_detections[frame_idx] = []
+            logger.error(f"Error processing catalog video {job.video_id}: {e}")
+            job.store.error = str(e)
+        
+        job.finished_at = time.time()
+        if job.store.failure():
+            job.state = 'failed'
+            job.store.error = job.store.failure()
+            release_model(job.store)
+            with catalog_lock:
+                # A failed first run must not stay served as if it were complete
+                if catalog_stores.get(job.video_id) is job.store:
+                    del catalog_stores[job.video_id]
+        else:
+            job.state = 'done'
+            with catalog_lock:
+                served = catalog_stores.get(job.video_id)
+                if served is not None and served is not job.store:
+                    # Keep the replaced store for players still showing it,
+                    # without a reference on its engine
+                    served.previous = None
+                    job.store.previous = served
+                    release_model(served)
+                catalog_stores[job.video_id] = job.store
+        logger.info(f"Catalog job {job.video_id} {job.state} in {job.finished_at - job.started_at:.1f}s")
+        job_queue.task_done()
+
+def enqueue_video(video_id, overrides):
+    with catalog_lock:
+        previous = catalog_jobs.get(video_id)
+        if previous is not None and previous.state in ('queued', 'running'):
+            return None
+        
+        # Bump the generation so open players pick up the new results
+        served = catalog_stores.get(video_id)
+        job = CatalogJob(video_id, dict(DEFAULT_CONFIG, **overrides),
+                         generation=served.generation + 1 if served else 0)
+        catalog_jobs[video_id] = job
+    job_queue.put(job)
+    return job
+
+def catalog_status():
+    jobs = [job.to_dict() for job in list(catalog_jobs.values())]
+    running = [j for j in jobs if j['state'] == 'running']
+    return {
+        'workers': CATALOG_WORKERS,
+        'queued': sum(j['state'] == 'queued' for j in jobs),
+        'running': len(running),
+        'done': sum(j['state'] == 'done' for j in jobs),
+        'failed': sum(j['state'] == 'failed' for j in jobs),
+        'frames_processed': sum(j['frames_processed'] for j in jobs),
+        'throughput_fps': round(sum(j['fps'] for j in running), 2),  # Across running jobs
+        'jobs': jobs,
+    }
+
+def admin_denied():
+    """Error response unless the request carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        return {'error': 'admin endpoints are disabled, set SHOPPABLE_ADMIN_TOKEN'}, 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return {'error': 'unauthorized'}, 401
+    return None
+
+# Responses shared by the main video and catalog videos
+def render_player(current, base_url):
+    # Create updated HTML with inline data
+    available_classes = current.config['definitions']['classes']
+    
+    # Generate a compact JSON string of the first 100 frames for immediate display
+    initial_detections = {}
+    for i in range(min(100, len(current.all_detections))):
+        if i in current.all_detections:
+            initial_detections[i] = current.all_detections[i]
     
-    logger.info(f"Finished processing video. Processed {len(all_detections)} frames")
-    cap.release()
-    processed = True
+    # Data goes in as template variables so it is never evaluated as template code
+    return render_template_string(
+        HTML_PAGE,
+        available_classes=available_classes,
+        video_metadata=current.video_metadata,
+        initial_detections=initial_detections,
+        processing_done=current.processed,
+        generation=current.generation,
+        base_url=base_url
+    )
+
+def frame_data(current, frame_idx):
+    # Simple function to get a specific frame's data if it wasn't in the initial batch
+    return {
+        'detections': current.all_detections.get(frame_idx, []),
+        'generation': current.generation
+    }
+
+def timeline_data(current):
+    fps = current.video_metadata['fps']
+    # Visible intervals and total exposure per class and per track
+    return dict(current.timeline.to_dict(fps), fps=fps, processed=current.processed)
+
+def class_timeline_data(current, class_name):
+    # Intervals for one class, plus the next appearance after ?after_us=
+    fps = current.video_metadata['fps']
+    after_us = request.args.get('after_us', type=int)
+    return dict(current.timeline.class_summary(class_name, fps),
+                next=current.timeline.next_appearance(class_name, after_us, fps))
 
 def create_app():
     # Start processing thread
-    processing_thread = threading.Thread(target=process_video, daemon=True)
+    processing_thread = threading.Thread(target=process_initial, daemon=True)
     processing_thread.start()
     
+    # Start catalog workers
+    for _ in range(CATALOG_WORKERS):
+        threading.Thread(target=catalog_worker, daemon=True).start()
+    
     app = Flask(__name__)
     
     @app.route('/')
     def index():
-        # Create updated HTML with inline data
-        available_classes = definitions['classes']
-        
-        # Generate a compact JSON string of the first 100 frames for immediate display
-        initial_detections = {}
-        for i in range(min(100, len(all_detections))):
-            if i in all_detections:
-                initial_detections[i] = all_detections[i]
-        
-        return render_template_string(
-            HTML_PAGE.replace(
-                '/* INJECTED_DATA */', 
-                f'''
-                const AVAILABLE_CLASSES = {available_classes};
-                const VIDEO_METADATA = {video_metadata};
-                const INITIAL_DETECTIONS = {initial_detections};
-                const PROCESSING_DONE = {str(processed).lower()};
-                '''
-            )
-        )
+        return render_player(store, '/')
 
     @app.route('/video_file')
     def video_file():
-        return send_file(VIDEO_FILE, mimetype='video/mp4')
+        # Players pass their generation so a swap never changes the file under them
+        current = store_for_generation(store, request.args.get('g', type=int))
+        if current is None:
+            abort(404)
+        return send_file(current.config['video_file'], mimetype='video/mp4')
         
     @app.route('/get_frame_data/<int:frame_idx>')
     def get_frame_data(frame_idx):
-        # Simple function to get a specific frame's data if it wasn't in the initial batch
-        if frame_idx in all_detections:
-            return {'detections': all_detections[frame_idx]}
-        else:
-            return {'detections': []}
+        return frame_data(store, frame_idx)
+
+    @app.route('/timeline')
+    def get_timeline():
+        return timeline_data(store)
+
+    @app.route('/timeline/<class_name>')
+    def get_class_timeline(class_name):
+        return class_timeline_data(store, class_name)
+
+    @app.route('/admin/reload', methods=['POST'])
+    def admin_reload():
+        # Load a new engine and/or video into a shadow store in the background
+        denied = admin_denied()
+        if denied:
+            return denied
+        
+        overrides = request.get_json(silent=True) or {}
+        error = validate_settings(overrides)
+        if error:
+            return {'error': error}, 400
+        
+        if not reload_lock.acquire(blocking=False):
+            return {'error': 'processing already in progress'}, 409
+        
+        threading.Thread(target=reload_store, args=(overrides,), daemon=True).start()
+        return {'status': 'started', 'generation': store.generation + 1}, 202
+
+    @app.route('/admin/status')
+    def admin_status():
+        denied = admin_denied()
+        if denied:
+            return denied
+        
+        current = store
+        return dict(reload_status, generation=current.generation, processed=current.processed,
+                    video_file=current.config['video_file'], engine_path=current.config['engine_path'])
+
+    @app.route('/jobs', methods=['POST'])
+    def create_jobs():
+        # Queue one video ({"video_file": ...}) or a list of them for the catalog
+        denied = admin_denied()
+        if denied:
+            return denied
+        
+        body = request.get_json(silent=True)
+        entries = body if isinstance(body, list) else [body]
+        if not entries or not all(isinstance(e, dict) and e.get('video_file') for e in entries):
+            return {'error': 'each job needs a video_file'}, 400
+        
+        jobs = []
+        for entry in entries:
+            overrides = dict(entry)
+            video_id = overrides.pop('video_id', None)
+            error = validate_settings(overrides)
+            if error:
+                return {'error': error}, 400
+            # Default the id to the video's file name without extension
+            video_id = video_id or os.path.splitext(os.path.basename(overrides['video_file']))[0]
+            if not isinstance(video_id, str) or not VIDEO_ID_PATTERN.fullmatch(video_id):
+                return {'error': f"invalid video_id: {video_id}"}, 400
+            jobs.append((video_id, overrides))
+        
+        queued, skipped = [], []
+        for video_id, overrides in jobs:
+            job = enqueue_video(video_id, overrides)
+            if job is None:
+                skipped.append(video_id)  # Already queued or running
+            else:
+                queued.append(job.to_dict())
+        return {'queued': queued, 'skipped': skipped}, 202
+
+    @app.route('/jobs')
+    def list_jobs():
+        denied = admin_denied()
+        if denied:
+            return denied
+        return catalog_status()
+
+    @app.route('/jobs/<video_id>')
+    def get_job(video_id):
+        denied = admin_denied()
+        if denied:
+            return denied
+        job = catalog_jobs.get(video_id)
+        if job is None:
+            abort(404)
+        return job.to_dict()
+
+    def catalog_store(video_id):
+        current = catalog_stores.get(video_id)
+        if current is None:
+            abort(404)
+        return current
+
+    @app.route('/videos/<video_id>/')
+    def catalog_index(video_id):
+        return render_player(catalog_store(video_id), f'/videos/{video_id}/')
+
+    @app.route('/videos/<video_id>/video_file')
+    def catalog_video_file(video_id):
+        current = store_for_generation(catalog_store(video_id), request.args.get('g', type=int))
+        if current is None:
+            abort(404)
+        return send_file(current.config['video_file'], mimetype='video/mp4')
+
+    @app.route('/videos/<video_id>/get_frame_data/<int:frame_idx>')
+    def catalog_frame_data(video_id, frame_idx):
+        return frame_data(catalog_store(video_id), frame_idx)
+
+    @app.route('/videos/<video_id>/timeline')
+    def catalog_timeline(video_id):
+        return timeline_data(catalog_store(video_id))
+
+    @app.route('/videos/<video_id>/timeline/<class_name>')
+    def catalog_class_timeline(video_id, class_name):
+        return class_timeline_data(catalog_store(video_id), class_name)
 
     return app
 
@@ -294,6 +799,16 @@ HTML_PAGE = '''
       left: calc(100% - 3px);
       transform: translateX(-100%);
     }
+    .jump-control {
+      display: inline-block;
+      margin-left: 20px;
+    }
+    .jump-control select {
+      padding: 8px;
+      font-size: 14px;
+      border: 1px solid #ccc;
+      border-radius: 4px;
+    }
     .video-container { 
       position: relative; 
       display: block;
@@ -384,10 +899,14 @@ HTML_PAGE = '''
       <input type="checkbox" id="show-boxes" checked />
       <label for="show-boxes" class="switch"></label>
     </div>
+    <div class="jump-control">
+      <select id="jump-class"></select>
+      <button id="jump-next">Next Appearance</button>
+    </div>
   </div>
   <div class="video-container">
     <video id="player" controls>
-      <source src="/video_file" type="video/mp4" />
+      <source src="{{ base_url }}video_file?g={{ generation }}" type="video/mp4" />
     </video>
     <canvas id="overlay"></canvas>
     <div id="tooltip" class="tooltip" style="display:none"></div>
@@ -398,7 +917,12 @@ HTML_PAGE = '''
   
   <script>
     // Injected data from server - will be populated when page loads
-    /* INJECTED_DATA */
+    const AVAILABLE_CLASSES = {{ available_classes|tojson }};
+    const VIDEO_METADATA = {{ video_metadata|tojson }};
+    const INITIAL_DETECTIONS = {{ initial_detections|tojson }};
+    const PROCESSING_DONE = {{ processing_done|tojson }};
+    const GENERATION = {{ generation|tojson }};
+    const BASE_URL = {{ base_url|tojson }};
     
     // DOM elements
     const player = document.getElementById('player');
@@ -411,6 +935,7 @@ HTML_PAGE = '''
     const videoInfoDisplay = document.getElementById('video-info');
     const classFilterInput = document.getElementById('class-filter');
     const availableClassesSpan = document.getElementById('available-classes');
+    const jumpClassSelect = document.getElementById('jump-class');
     
     // State variables
     let detections = [];
@@ -430,6 +955,7 @@ HTML_PAGE = '''
     // Update available classes
     if (AVAILABLE_CLASSES) {
       availableClassesSpan.textContent = AVAILABLE_CLASSES.join(', ');
+      AVAILABLE_CLASSES.forEach(c => jumpClassSelect.add(new Option(c, c)));
     }
     
     // Generate consistent colors for tracking IDs
@@ -462,9 +988,15 @@ HTML_PAGE = '''
       
       // Otherwise fetch from server
       try {
-        const response = await fetch(`/get_frame_data/${frameIdx}`);
+        const response = await fetch(`${BASE_URL}get_frame_data/${frameIdx}`);
         const data = await response.json();
         
+        // A reload swapped in new results; restart on the new video
+        if (data.generation !== GENERATION) {
+          location.reload();
+          return [];
+        }
+        
         // Cache the result
         cachedDetections[frameIdx] = data.detections;
         return data.detections;
@@ -666,6 +1198,29 @@ HTML_PAGE = '''
     });
     player.addEventListener('seeking', updateDetections);
     
+    // Jump to the next time the selected product appears
+    async function jumpToNextAppearance() {
+      const cls = jumpClassSelect.value;
+      const afterUs = Math.floor(player.currentTime * 1e6);
+      
+      try {
+        const response = await fetch(`${BASE_URL}timeline/${encodeURIComponent(cls)}?after_us=${afterUs}`);
+        const data = await response.json();
+        
+        if (!data.next) {
+          statusDisplay.textContent = `No further appearance of ${cls}`;
+          return;
+        }
+        
+        player.currentTime = data.next[0] / 1e6;
+        statusDisplay.textContent = `${cls} at ${(data.next[0] / 1e6).toFixed(2)}s`;
+      } catch (error) {
+        console.error("Error fetching timeline:", error);
+      }
+    }
+    
+    document.getElementById('jump-next').addEventListener('click', jumpToNextAppearance);
+    
     // Play/pause buttons
     document.getElementById('play').addEventListener('click', () => player.play());
     document.getElementById('pause').addEventListener('click', () => player.pause());
@@ -680,16 +1235,20 @@ HTML_PAGE = '''
     // Show processing status
     if (!PROCESSING_DONE) {
       statusDisplay.textContent = "Processing video in background...";
-      
-      // Check processing status every 5 seconds
-      const checkInterval = setInterval(() => {
-        fetch('/get_frame_data/0')
-          .then(response => response.json())
-          .then(() => {
-            updateDetections();
-          });
-      }, 5000);
     }
+    
+    // Check every 5 seconds for new detections and for a reload swapping in new results
+    const checkInterval = setInterval(() => {
+      fetch(`${BASE_URL}get_frame_data/0`)
+        .then(response => response.json())
+        .then(data => {
+          if (data.generation !== GENERATION) {
+            location.reload();
+          } else if (!PROCESSING_DONE) {
+            updateDetections();
+          }
+        });
+    }, 5000);
   </script>
 </body>
 </html>
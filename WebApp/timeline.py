@@ -0,0 +1,77 @@
+from bisect import bisect_right
+
+
+class VisibilityIndex:
+    """Maps each class and each track to the frame intervals it is visible in.
+
+    Built incrementally while frames are processed, so queries never have to
+    scan every frame's detections. Intervals are inclusive [start, end] frame
+    pairs; detections at most `max_gap` frames apart are merged into one.
+    """
+
+    def __init__(self, max_gap=1):
+        self.max_gap = max_gap
+        self.classes = {}  # class name -> [[start, end], ...]
+        self.tracks = {}   # track id -> {'class': name, 'intervals': [[start, end], ...]}
+        self._starts = {}  # class name -> start frame of each interval, for bisecting
+
+    def _extend(self, intervals, frame_idx):
+        """Extend the last interval or open a new one. Returns True for a new one."""
+        if intervals and frame_idx - intervals[-1][1] <= self.max_gap:
+            intervals[-1][1] = frame_idx
+            return False
+        intervals.append([frame_idx, frame_idx])
+        return True
+
+    def add_frame(self, frame_idx, frame_objects):
+        """Record the detections of one frame. Frames must arrive in order."""
+        for class_name in {obj['class'] for obj in frame_objects}:
+            # Intervals are appended before starts, so a start always has its interval
+            if self._extend(self.classes.setdefault(class_name, []), frame_idx):
+                self._starts.setdefault(class_name, []).append(frame_idx)
+        for obj in frame_objects:
+            track = self.tracks.setdefault(str(obj['id']), {'class': obj['class'], 'intervals': []})
+            self._extend(track['intervals'], frame_idx)
+
+    @staticmethod
+    def _to_us(intervals, fps):
+        # End is exclusive: the interval lasts until the frame after `end`
+        return [[round(start * 1e6 / fps), round((end + 1) * 1e6 / fps)] for start, end in intervals]
+
+    @classmethod
+    def _summary(cls, intervals, fps):
+        intervals_us = cls._to_us(intervals, fps)
+        return {
+            'intervals': intervals_us,
+            'appearances': len(intervals_us),
+            'total_us': sum(end - start for start, end in intervals_us),
+            'first_us': intervals_us[0][0] if intervals_us else None,
+            'last_us': intervals_us[-1][1] if intervals_us else None,
+        }
+
+    def class_summary(self, class_name, fps):
+        return self._summary(list(self.classes.get(class_name, [])), fps)
+
+    def to_dict(self, fps):
+        """Intervals and exposure aggregates for all classes and tracks, in microseconds."""
+        tracks = {}
+        for track_id, track in list(self.tracks.items()):
+            tracks[track_id] = dict(self._summary(list(track['intervals']), fps), **{'class': track['class']})
+        return {
+            'classes': {name: self._summary(list(intervals), fps) for name, intervals in list(self.classes.items())},
+            'tracks': tracks,
+        }
+
+    def next_appearance(self, class_name, after_us, fps):
+        """First [start_us, end_us] interval of a class starting after `after_us`, or None.
+
+        The comparison is done in frames, so a player time that lands a
+        microsecond short of an interval start still counts as that frame.
+        With `after_us` None the first interval is returned.
+        """
+        current_frame = -1 if after_us is None else round(after_us * fps / 1e6)
+        starts = self._starts.get(class_name, [])
+        idx = bisect_right(starts, current_frame)
+        if idx >= len(starts):
+            return None
+        return self._to_us([self.classes[class_name][idx]], fps)[0]
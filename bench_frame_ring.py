@@ -0,0 +1,85 @@
+"""Compare frame allocation and peak memory of cap.read() against FrameRing.
+
+Usage: python bench_frame_ring.py VIDEO [--frames N] [--mode baseline|ring]
+
+Without --mode both variants run, each in its own subprocess so that peak
+RSS is measured independently.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import cv2
+
+from frame_ring import FrameRing
+
+
+def run(video_path, mode, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    ring = None
+    if mode == 'ring':
+        # Sized from the first decoded frame, like the pipelines do
+        ring = FrameRing.for_capture(cap, slots=2)
+        if ring is None:
+            raise SystemExit(f"No frames could be decoded from {video_path}")
+
+    tracemalloc.start()
+    seen_buffers = set()
+    allocated_bytes = 0
+    frame_count = 0
+    start_time = time.perf_counter()
+
+    while frame_count < max_frames:
+        if ring is None:
+            ret, frame = cap.read()
+            if not ret:
+                break
+        else:
+            slot, frame = ring.read(cap)
+            if slot is None:
+                break
+
+        # Any frame whose data pointer was not seen before is a fresh allocation
+        ptr = frame.__array_interface__['data'][0]
+        if ring is None or ptr not in seen_buffers:
+            allocated_bytes += frame.nbytes
+            seen_buffers.add(ptr)
+
+        if ring is not None:
+            ring.release(slot)
+        frame_count += 1
+
+    elapsed = time.perf_counter() - start_time
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cap.release()
+    if ring is not None:
+        # Ring buffers live in shared memory and are not seen by tracemalloc;
+        # add the one frame for_capture() decoded to size the ring
+        allocated_bytes = ring.frames.nbytes + ring.frames[0].nbytes
+        ring.close()
+
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>8}: {frame_count} frames in {elapsed:.2f}s "
+          f"({frame_count / elapsed:.1f} FPS), "
+          f"frame buffers allocated: {allocated_bytes / 2**20:.1f} MB "
+          f"({allocated_bytes / 2**20 / elapsed:.1f} MB/s), "
+          f"traced peak: {traced_peak / 2**20:.1f} MB, max RSS: {max_rss_mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video')
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--mode', choices=['baseline', 'ring'])
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.video, args.mode, args.frames)
+    else:
+        for mode in ('baseline', 'ring'):
+            subprocess.run([sys.executable, __file__, args.video,
+                            '--frames', str(args.frames), '--mode', mode], check=True)
@@ -3,6 +3,9 @@ import time
 import os
 from ultralytics import YOLO
 
+from frame_ring import FrameRing
+from overlay import OverlayRenderer, SidecarWriter, open_video_writer
+
 # Task definition
 task = "detect"
 
@@ -16,46 +19,70 @@ model = YOLO(model_path)
 video_path = "/home/mcw/Karthick/shopable-ads/sunglasses1.mp4"
 cap = cv2.VideoCapture(video_path)
 
+# Decoded frames are written in place into a small ring of preallocated
+# buffers, sized from the first decoded frame rather than reported properties
+ring = FrameRing.for_capture(cap, slots=2)
+if ring is None:
+    raise SystemExit(f"No frames could be decoded from {video_path}")
+
 # Get video properties
-width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+height, width = ring.shape[:2]
 fps_input = cap.get(cv2.CAP_PROP_FPS)
-output_path = "processed_output.mp4"
+if fps_input <= 0 or fps_input > 120:
+    fps_input = 30.0  # Default fallback
 
-# VideoWriter to save output
-fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # or 'XVID'
-out = cv2.VideoWriter(output_path, fourcc, fps_input, (width, height))
+# Output mode: "video" writes an annotated video (piped to ffmpeg when available),
+# "sidecar" only writes detections to a compact .npz without re-encoding
+output_mode = "video"
 
 frame_count = 0
 total_detections = 0
-start_time = time.time()
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    # Run inference
-    results = model(frame, imgsz=1280)[0]
-
-    # Draw results
-    annotated_frame = results.plot()
-
-    # Write to output video
-    out.write(annotated_frame)
-
-    # Count detections
-    num_detections = len(results.boxes)
-    total_detections += num_detections
-    frame_count += 1
+out = None
+
+try:
+    if output_mode == "sidecar":
+        output_path = "processed_output.npz"
+        out = SidecarWriter(output_path, width, height, fps_input, names=model.names)
+    else:
+        output_path = "processed_output.mp4"
+        out = open_video_writer(output_path, width, height, fps_input)
+        renderer = OverlayRenderer(model.names)
+
+    start_time = time.time()
+    while True:
+        slot, frame = ring.read(cap)
+        if slot is None:
+            break
+
+        # Run inference
+        results = model(frame, imgsz=1280)[0]
+
+        # Single device-to-host copy of all boxes: x1, y1, x2, y2, conf, cls
+        boxes = results.boxes.data.cpu().numpy()
+
+        if output_mode == "sidecar":
+            out.write(boxes)
+        else:
+            # Draw onto the decoded frame in place and write it out
+            out.write(renderer.draw(frame, boxes))
+
+        # Count detections
+        num_detections = len(boxes)
+        total_detections += num_detections
+        frame_count += 1
+        ring.release(slot)
+finally:
+    # Release resources, unlinking the ring's shared memory even on errors
+    cap.release()
+    try:
+        if out is not None:
+            out.release()
+    finally:
+        ring.close()
 
 end_time = time.time()
 fps = frame_count / (end_time - start_time)
 
-# Release resources
-cap.release()
-out.release()
-
 # Get model file size in megabytes
 model_size_bytes = os.path.getsize(model_path)
 model_size_mb = model_size_bytes / (1024 * 1024)
@@ -68,4 +95,4 @@ print(f"Model Size: {model_size_mb:.1f} MB")
 print(f"Frames Processed: {frame_count}")
 print(f"Total Detections: {total_detections}")
 print(f"FPS: {fps:.2f}")
-print(f"Saved video to: {output_path}")
+print(f"Saved {output_mode} to: {output_path}")
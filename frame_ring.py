@@ -0,0 +1,101 @@
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameRing:
+    """Preallocated ring of frame buffers that the decoder fills in place.
+
+    Buffers live in one shared memory block. Stages borrow a slot with
+    `acquire()` (or `read()`) and hand it back with `release()`. To share the
+    ring with another process, create it with a `multiprocessing.Queue` as
+    `free_slots` and attach from the other side with the same queue,
+    `name=ring.name` and `create=False`.
+    """
+
+    def __init__(self, shape, slots=4, dtype=np.uint8, name=None, create=True, free_slots=None):
+        if not create and free_slots is None:
+            raise ValueError("Attaching to an existing ring needs the creator's free_slots queue")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=frame_bytes * slots)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = create
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+        self._pending = None  # First frame decoded by for_capture()
+        self._free = free_slots if free_slots is not None else queue.Queue()
+        if create:
+            for slot in range(slots):
+                self._free.put(slot)
+
+    @classmethod
+    def for_capture(cls, cap, slots=4, **kwargs):
+        """Create a ring sized from the first frame decoded from `cap`.
+
+        Reported capture properties can disagree with the decoded frames
+        (rotated videos, backends reporting 0), so the frame itself is used.
+        The first frame is returned by the first `read()`. Returns None if
+        nothing can be decoded.
+        """
+        ret, frame = cap.read()
+        if not ret:
+            return None
+        ring = cls(frame.shape, slots, frame.dtype, **kwargs)
+        ring._pending = frame
+        return ring
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def acquire(self, timeout=None):
+        """Borrow a free slot, blocking until one is returned."""
+        return self._free.get(timeout=timeout)
+
+    def release(self, slot):
+        """Return a borrowed slot to the ring."""
+        self._free.put(slot)
+
+    def read(self, cap, timeout=None):
+        """Decode the next frame from a cv2.VideoCapture into a free slot.
+
+        Returns (slot, frame), or (None, None) at end of stream.
+        """
+        slot = self.acquire(timeout)
+        buf = self.frames[slot]
+        if self._pending is not None:
+            buf[...] = self._pending
+            self._pending = None
+            return slot, buf
+
+        ret, frame = cap.read(buf)
+        if not ret:
+            self.release(slot)
+            return None, None
+        if frame is not buf:
+            # OpenCV reallocates when the stream does not match the ring shape
+            if frame.shape != self.shape:
+                self.release(slot)
+                raise ValueError(f"Decoded frame shape {frame.shape} does not match ring shape {self.shape}")
+            buf[...] = frame
+        return slot, buf
+
+    def close(self):
+        # Drop the numpy view first so the shared memory can be unmapped
+        self.frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
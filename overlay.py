@@ -0,0 +1,150 @@
+import logging
+import shutil
+import subprocess
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BGR colors cycled by class id
+PALETTE = [
+    (56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255),
+    (49, 210, 207), (10, 249, 72), (23, 204, 146), (134, 219, 61),
+    (211, 188, 0), (255, 149, 0), (255, 55, 9), (199, 55, 255),
+]
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Frame rate used when the capture reports none or an implausible one
+DEFAULT_FPS = 30.0
+
+
+class OverlayRenderer:
+    """Draws boxes and labels in place onto a frame.
+
+    Boxes are drawn with numpy slice assignment and labels are blitted from
+    pre-rendered glyphs, so no per-frame image is allocated.
+    """
+
+    def __init__(self, names, thickness=2, font_scale=0.6):
+        self.names = names
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self._glyphs = {}  # (class_id, conf percent) -> rendered label
+
+    def _color(self, class_id):
+        return PALETTE[class_id % len(PALETTE)]
+
+    def _label(self, class_id, conf):
+        # Confidence is rounded to 2 decimals so the cache stays bounded
+        key = (class_id, round(conf * 100))
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            text = f"{self.names[class_id]} {key[1] / 100:.2f}"
+            (tw, th), baseline = cv2.getTextSize(text, FONT, self.font_scale, 1)
+            glyph = np.empty((th + baseline + 4, tw + 4, 3), dtype=np.uint8)
+            glyph[:] = self._color(class_id)
+            cv2.putText(glyph, text, (2, th + 2), FONT, self.font_scale,
+                        (255, 255, 255), 1, cv2.LINE_AA)
+            self._glyphs[key] = glyph
+        return glyph
+
+    def draw(self, frame, boxes):
+        """Draw (N, 6) boxes [x1, y1, x2, y2, conf, cls] onto frame in place."""
+        if len(boxes) == 0:
+            return frame
+
+        h, w = frame.shape[:2]
+        t = self.thickness
+        xyxy = np.rint(boxes[:, :4]).astype(np.int32)
+        np.clip(xyxy[:, 0::2], 0, w - 1, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, h - 1, out=xyxy[:, 1::2])
+        class_ids = boxes[:, 5].astype(np.int32)
+
+        # Boxes entirely off-frame collapse to zero size after clipping
+        keep = (xyxy[:, 0] < xyxy[:, 2]) & (xyxy[:, 1] < xyxy[:, 3])
+        xyxy, boxes, class_ids = xyxy[keep], boxes[keep], class_ids[keep]
+
+        for (x1, y1, x2, y2), conf, class_id in zip(xyxy.tolist(), boxes[:, 4].tolist(), class_ids.tolist()):
+            color = self._color(class_id)
+
+            # Box edges
+            frame[y1:y1 + t, x1:x2 + 1] = color
+            frame[max(y2 - t + 1, 0):y2 + 1, x1:x2 + 1] = color
+            frame[y1:y2 + 1, x1:x1 + t] = color
+            frame[y1:y2 + 1, max(x2 - t + 1, 0):x2 + 1] = color
+
+            # Label above the box, or inside it when there is no room
+            glyph = self._label(class_id, conf)
+            gh, gw = glyph.shape[:2]
+            ly = y1 - gh if y1 >= gh else y1
+            gh = min(gh, h - ly)
+            gw = min(gw, w - x1)
+            frame[ly:ly + gh, x1:x1 + gw] = glyph[:gh, :gw]
+
+        return frame
+
+
+class FFmpegWriter:
+    """Streams raw BGR frames to an ffmpeg subprocess through a pipe."""
+
+    def __init__(self, path, width, height, fps, codec='libx264', preset='veryfast', ffmpeg='ffmpeg'):
+        if not 0 < fps <= 120:
+            fps = DEFAULT_FPS  # ffmpeg rejects -r 0
+        cmd = [
+            ffmpeg, '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{width}x{height}', '-r', str(fps),
+            '-i', '-', '-an', '-c:v', codec,
+        ]
+        if preset:
+            cmd += ['-preset', preset]
+        cmd += ['-pix_fmt', 'yuv420p', path]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        # Hand the frame's own buffer to the pipe instead of copying it
+        self._proc.stdin.write(frame.data if frame.flags.c_contiguous else frame.tobytes())
+
+    def release(self):
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            # ffmpeg already exited; its exit code below says why
+            pass
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self._proc.returncode}")
+
+
+class SidecarWriter:
+    """Collects per-frame detections and saves them to a compressed .npz.
+
+    The file holds `boxes`, an (N, 6) float32 array of [x1, y1, x2, y2, conf,
+    cls], and `offsets`, where frame i owns boxes[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, path, width, height, fps, names=None):
+        self.path = path
+        self.meta = {'width': width, 'height': height, 'fps': fps}
+        if names is not None:
+            self.meta['names'] = [names[i] for i in sorted(names)] if isinstance(names, dict) else list(names)
+        self._frames = []
+
+    def write(self, boxes):
+        self._frames.append(np.asarray(boxes, dtype=np.float32).reshape(-1, 6))
+
+    def release(self):
+        offsets = np.zeros(len(self._frames) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in self._frames], out=offsets[1:])
+        boxes = np.concatenate(self._frames) if self._frames else np.empty((0, 6), dtype=np.float32)
+        np.savez_compressed(self.path, boxes=boxes, offsets=offsets, **self.meta)
+
+
+def open_video_writer(path, width, height, fps):
+    """Return an ffmpeg pipe writer, or cv2.VideoWriter when ffmpeg is not installed."""
+    if shutil.which('ffmpeg'):
+        return FFmpegWriter(path, width, height, fps)
+    logger.warning("ffmpeg not found, falling back to cv2.VideoWriter (mp4v)")
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    return cv2.VideoWriter(path, fourcc, fps, (width, height))
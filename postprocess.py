@@ -0,0 +1,63 @@
+import numpy as np
+
+
+def filter_boxes(data, min_size=20, conf=0.0, num_classes=None):
+    """Vectorized filtering of (N, 6) [x1, y1, x2, y2, conf, cls] detections.
+
+    Drops boxes narrower or shorter than `min_size`, below `conf`, or with a
+    class id outside `num_classes`. Returns int ltwh boxes (N, 4), confidences
+    (N,) and class ids (N,).
+    """
+    xyxy = data[:, :4]
+    wh = xyxy[:, 2:] - xyxy[:, :2]
+    confs = data[:, 4]
+    class_ids = data[:, 5].astype(np.int64)
+
+    keep = (wh >= min_size).all(axis=1) & (confs >= conf)
+    if num_classes is not None:
+        keep &= (class_ids >= 0) & (class_ids < num_classes)
+
+    # astype truncates like int() did on each coordinate
+    ltwh = np.concatenate([xyxy[keep, :2], wh[keep]], axis=1).astype(np.int64)
+    return ltwh, confs[keep], class_ids[keep]
+
+
+def boxes_to_tracker_input(boxes, min_size=20, conf=0.0, num_classes=None):
+    """Turn YOLO results boxes into DeepSort input with a single device-to-host copy.
+
+    `boxes` is an ultralytics Boxes object or an (N, 6) array. Returns a list of
+    ([left, top, w, h], conf, class_id) tuples.
+    """
+    data = boxes.data.cpu().numpy() if hasattr(boxes, 'data') and hasattr(boxes.data, 'cpu') else np.asarray(boxes)
+    ltwh, confs, class_ids = filter_boxes(data.reshape(-1, 6), min_size, conf, num_classes)
+    return list(zip(ltwh.tolist(), confs.tolist(), class_ids.tolist()))
+
+
+def per_box_tracker_input(boxes, min_size=20):
+    """Unvectorized baseline: the per-box loop process_video() originally ran.
+
+    Kept unmodified as the reference for tests and bench_postprocess.py. Like
+    the original it does no confidence or class filtering. `boxes` is an
+    ultralytics Boxes object or an (N, 6) array.
+    """
+    detections = []
+    for box in boxes:
+        if hasattr(box, 'xyxy'):
+            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+        else:
+            x1, y1, x2, y2 = box[:4]
+        w = x2 - x1
+        h = y2 - y1
+
+        # Skip tiny detections
+        if w < min_size or h < min_size:
+            continue
+
+        if hasattr(box, 'xyxy'):
+            conf = float(box.conf)
+            class_id = int(box.cls)
+        else:
+            conf = float(box[4])
+            class_id = int(box[5])
+        detections.append(([int(x1), int(y1), int(w), int(h)], conf, class_id))
+    return detections
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Shared helpers live in the repository root, web app modules in WebApp/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'WebApp'))
@@ -0,0 +1,118 @@
+import multiprocessing
+import queue
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from frame_ring import FrameRing
+
+
+class FakeCapture:
+    """Mimics cv2.VideoCapture.read, filling the given buffer when it fits."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read(self, image=None):
+        if not self.frames:
+            return False, None
+        frame = self.frames.pop(0)
+        if image is not None and image.shape == frame.shape:
+            image[...] = frame
+            return True, image
+        return True, frame.copy()
+
+
+def make_frames(count, shape=(4, 6, 3)):
+    return [np.full(shape, i, dtype=np.uint8) for i in range(count)]
+
+
+def test_read_fills_slots_in_place():
+    with FrameRing((4, 6, 3), slots=2) as ring:
+        cap = FakeCapture(make_frames(5))
+        seen = []
+        while True:
+            slot, frame = ring.read(cap)
+            if slot is None:
+                break
+            assert np.shares_memory(frame, ring.frames)
+            seen.append(int(frame[0, 0, 0]))
+            ring.release(slot)
+        assert seen == [0, 1, 2, 3, 4]
+
+
+def test_for_capture_sizes_from_first_frame():
+    cap = FakeCapture(make_frames(3, shape=(8, 2, 3)))
+    ring = FrameRing.for_capture(cap, slots=2)
+    try:
+        assert ring.shape == (8, 2, 3)
+        values = []
+        while True:
+            slot, frame = ring.read(cap)
+            if slot is None:
+                break
+            values.append(int(frame[0, 0, 0]))
+            ring.release(slot)
+        assert values == [0, 1, 2]
+    finally:
+        ring.close()
+
+
+def test_for_capture_empty_stream():
+    assert FrameRing.for_capture(FakeCapture([])) is None
+
+
+def test_shape_change_raises_and_returns_slot():
+    with FrameRing((4, 6, 3), slots=1) as ring:
+        cap = FakeCapture(make_frames(1, shape=(6, 4, 3)))
+        with pytest.raises(ValueError, match='does not match ring shape'):
+            ring.read(cap)
+        # The slot was handed back, so the ring is still usable
+        assert ring.acquire(timeout=0) == 0
+
+
+def test_attach_shares_buffers():
+    free_slots = queue.Queue()
+    with FrameRing((2, 2, 3), slots=2, free_slots=free_slots) as ring:
+        other = FrameRing((2, 2, 3), slots=2, name=ring.name, create=False, free_slots=free_slots)
+        try:
+            ring.frames[1] = 7
+            assert (other.frames[1] == 7).all()
+        finally:
+            other.close()
+
+
+def test_attach_without_free_slots_raises():
+    with FrameRing((2, 2, 3), slots=1) as ring:
+        with pytest.raises(ValueError, match='free_slots'):
+            FrameRing((2, 2, 3), slots=1, name=ring.name, create=False)
+
+
+def fill_borrowed_slot(name, shape, slots, free_slots, value):
+    ring = FrameRing(shape, slots, name=name, create=False, free_slots=free_slots)
+    try:
+        slot = ring.acquire(timeout=10)
+        ring.frames[slot] = value
+        ring.release(slot)
+    finally:
+        ring.close()
+
+
+@pytest.mark.parametrize('start_method', [
+    m for m in ('spawn', 'fork') if m in multiprocessing.get_all_start_methods()
+])
+def test_slots_are_shared_across_processes(start_method):
+    ctx = multiprocessing.get_context(start_method)
+    free_slots = ctx.Queue()
+    with FrameRing((2, 2, 3), slots=1, free_slots=free_slots) as ring:
+        # The only slot is borrowed by the child, filled and handed back
+        worker = ctx.Process(target=fill_borrowed_slot,
+                             args=(ring.name, ring.shape, ring.slots, free_slots, 9))
+        worker.start()
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+        slot = ring.acquire(timeout=10)
+        assert (ring.frames[slot] == 9).all()
+        ring.release(slot)
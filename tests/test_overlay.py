@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from overlay import FFmpegWriter, OverlayRenderer, SidecarWriter
+
+
+def test_draw_in_place():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    boxes = np.array([[20, 40, 80, 90, 0.9, 1]], dtype=np.float32)
+    out = OverlayRenderer(['a', 'b']).draw(frame, boxes)
+    assert out is frame
+    assert frame.any()
+
+
+def test_off_frame_boxes_are_skipped():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    boxes = np.array([
+        [250, 10, 300, 50, 0.9, 0],   # Right of the frame
+        [10, -80, 50, -20, 0.9, 0],   # Above the frame
+    ], dtype=np.float32)
+    OverlayRenderer(['a']).draw(frame, boxes)
+    assert not frame.any()
+
+
+def test_label_confidence_is_rounded():
+    renderer = OverlayRenderer(['a'])
+    renderer._label(0, 0.899)
+    assert list(renderer._glyphs) == [(0, 90)]
+
+
+def test_sidecar_offsets(tmp_path):
+    path = str(tmp_path / 'detections.npz')
+    writer = SidecarWriter(path, 640, 480, 30.0, names={0: 'a', 1: 'b'})
+    writer.write(np.array([[0, 0, 10, 10, 0.5, 1]]))
+    writer.write(np.empty((0, 6)))
+    writer.write(np.array([[1, 1, 5, 5, 0.9, 0], [2, 2, 6, 6, 0.8, 1]]))
+    writer.release()
+
+    data = np.load(path)
+    assert data['offsets'].tolist() == [0, 1, 1, 3]
+    assert data['boxes'].shape == (3, 6)
+    assert data['names'].tolist() == ['a', 'b']
+
+
+@pytest.mark.skipif(not shutil.which('ffmpeg'), reason='ffmpeg not installed')
+def test_ffmpeg_writer_unknown_fps(tmp_path):
+    path = str(tmp_path / 'out.mp4')
+    writer = FFmpegWriter(path, 64, 48, 0)
+    writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+    assert os.path.getsize(path) > 0
+
+
+def test_ffmpeg_writer_release_reports_exit_code(tmp_path):
+    # Python rejects ffmpeg's arguments and exits without reading stdin, so
+    # flushing the buffered frame on close hits a broken pipe
+    writer = FFmpegWriter(str(tmp_path / 'out.mp4'), 2, 2, 30, ffmpeg=sys.executable)
+    writer._proc.wait()
+    writer.write(np.zeros((2, 2, 3), dtype=np.uint8))
+    with pytest.raises(RuntimeError, match='ffmpeg exited with code'):
+        writer.release()
@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from postprocess import boxes_to_tracker_input, filter_boxes, per_box_tracker_input
+
+
+EDGE_BOXES = np.array([
+    [10.0, 10.0, 30.0, 30.0, 0.9, 0],    # Exactly min_size wide and high: kept
+    [10.0, 10.0, 29.9, 40.0, 0.9, 1],    # Just under min_size wide: dropped
+    [10.0, 10.0, 40.0, 29.5, 0.8, 2],    # Just under min_size high: dropped
+    [0.5, 1.7, 100.9, 80.2, 0.7, 3],     # Fractional coordinates truncate
+    [5.0, 5.0, 50.0, 50.0, 0.6, -1],     # Negative class id
+    [5.0, 5.0, 50.0, 50.0, 0.6, 4],      # Class id past definitions
+    [200.0, 100.0, 260.0, 180.0, 0.5, 1],
+], dtype=np.float32)
+
+
+def test_matches_original_loop_on_edge_boxes():
+    # Without class filtering the vectorized path must match the original loop
+    expected = per_box_tracker_input(EDGE_BOXES, min_size=20)
+    assert boxes_to_tracker_input(EDGE_BOXES, min_size=20) == expected
+    assert [d[2] for d in expected] == [0, 3, -1, 4, 1]
+
+
+def test_class_filter_is_new_behaviour():
+    # The original loop passed every class id to the tracker; the vectorized
+    # path can drop ids outside the definitions before tracking
+    kept = [d for d in per_box_tracker_input(EDGE_BOXES, min_size=20) if 0 <= d[2] < 4]
+    assert boxes_to_tracker_input(EDGE_BOXES, min_size=20, num_classes=4) == kept
+    assert [d[2] for d in kept] == [0, 3, 1]
+
+
+def test_min_size_boundary_is_inclusive():
+    ltwh, confs, class_ids = filter_boxes(EDGE_BOXES[:1], min_size=20)
+    assert ltwh.tolist() == [[10, 10, 20, 20]]
+
+
+def test_confidence_filter():
+    _, confs, _ = filter_boxes(EDGE_BOXES, min_size=0, conf=0.65)
+    assert (confs >= 0.65).all()
+    assert len(confs) == 4
+
+
+def test_without_num_classes_keeps_any_class():
+    _, _, class_ids = filter_boxes(EDGE_BOXES, min_size=0)
+    assert class_ids.tolist() == [0, 1, 2, 3, -1, 4, 1]
+
+
+@pytest.mark.parametrize('empty', [
+    np.empty((0, 6), dtype=np.float32),
+    [],
+])
+def test_empty_input(empty):
+    assert boxes_to_tracker_input(empty, num_classes=4) == []
+    assert per_box_tracker_input(empty) == []
+    ltwh, confs, class_ids = filter_boxes(np.empty((0, 6), dtype=np.float32))
+    assert ltwh.shape == (0, 4) and confs.shape == (0,) and class_ids.shape == (0,)
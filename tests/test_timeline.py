@@ -0,0 +1,67 @@
+from timeline import VisibilityIndex
+
+
+def make_index(frames, class_name='watch', track_id=1, max_gap=1):
+    index = VisibilityIndex(max_gap=max_gap)
+    for frame_idx in frames:
+        index.add_frame(frame_idx, [{'id': track_id, 'class': class_name}])
+    return index
+
+
+def test_consecutive_frames_merge_into_intervals():
+    index = make_index([0, 1, 2, 5, 6, 10])
+    assert index.classes['watch'] == [[0, 2], [5, 6], [10, 10]]
+    assert index.tracks['1']['intervals'] == [[0, 2], [5, 6], [10, 10]]
+
+
+def test_max_gap_bridges_short_dropouts():
+    index = make_index([0, 1, 3, 4, 8], max_gap=2)
+    assert index.classes['watch'] == [[0, 4], [8, 8]]
+
+
+def test_summary_in_microseconds():
+    summary = make_index([0, 1, 2, 5, 6, 10]).to_dict(fps=10)['classes']['watch']
+    assert summary['intervals'] == [[0, 300000], [500000, 700000], [1000000, 1100000]]
+    assert summary['appearances'] == 3
+    assert summary['total_us'] == 600000
+    assert summary['first_us'] == 0
+    assert summary['last_us'] == 1100000
+
+
+def test_track_summary_keeps_class():
+    index = make_index([3, 4], class_name='suitcase', track_id=7)
+    assert index.to_dict(fps=25)['tracks']['7']['class'] == 'suitcase'
+
+
+def test_unknown_class_is_empty():
+    index = make_index([0])
+    assert index.class_summary('headphone', 30)['appearances'] == 0
+    assert index.next_appearance('headphone', 0, 30) is None
+
+
+def test_next_appearance_without_position_returns_first():
+    assert make_index([0, 1, 5]).next_appearance('watch', None, 10) == [0, 200000]
+
+
+def test_next_appearance_skips_current_interval_start():
+    index = make_index([0, 1, 5, 6, 10])
+    assert index.next_appearance('watch', 0, 10) == [500000, 700000]
+    assert index.next_appearance('watch', 500000, 10) == [1000000, 1100000]
+    assert index.next_appearance('watch', 1000000, 10) is None
+
+
+def test_next_appearance_tolerates_player_rounding():
+    # A player seeking to start_us / 1e6 can report a time 1 us short of the
+    # start; repeated jumps must still advance to the following interval
+    fps = 30
+    frames = range(1, 3000, 3)
+    index = make_index(frames, max_gap=1)
+    after_us = None
+    visited = []
+    while True:
+        interval = index.next_appearance('watch', after_us, fps)
+        if interval is None:
+            break
+        visited.append(interval[0])
+        after_us = interval[0] - 1
+    assert len(visited) == len(index.classes['watch'])